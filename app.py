@@ -16,7 +16,9 @@ from fastapi.responses import JSONResponse
 import math
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
-from typing import Dict
+import bisect
+from typing import Dict, List, Tuple
+from sortedcontainers import SortedList
 
 # --- Set Tesseract path for local development ---
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
@@ -60,7 +62,163 @@ def save_credits_db():
     with open("credits_db.json", "w") as f:
         json.dump(user_credits, f, indent=2)
 
+# --- Indexed credit store: leaderboard, per-user history and time buckets ---
+CREDIT_HISTORY_FILE = "credit_history.jsonl"
+# user_id -> deposits kept sorted by timestamp
+credit_history: Dict[str, List[dict]] = {}
+# (-balance, user_id) kept sorted, so the top K users are the first K entries
+credit_leaderboard: SortedList = SortedList()
+# period -> bucket key -> {"credits": total, "deposits": count}
+credit_buckets: Dict[str, Dict[str, dict]] = {"day": {}, "week": {}}
+
+def parse_timestamp(value, end_of_day=False):
+    # Stored and compared as naive local time, the same form datetime.now() gives
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    if end_of_day and len(value) <= 10:
+        # A date-only end bound covers the whole of that day
+        dt = dt.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return dt.isoformat(timespec="microseconds")
+
+def bucket_keys(timestamp):
+    dt = datetime.fromisoformat(timestamp)
+    year, week, _ = dt.isocalendar()
+    return {"day": dt.date().isoformat(), "week": f"{year}-W{week:02d}"}
+
+def index_deposit(entry):
+    history = credit_history.setdefault(entry["user_id"], [])
+    bisect.insort(history, entry, key=lambda e: e["timestamp"])
+    for period, key in bucket_keys(entry["timestamp"]).items():
+        bucket = credit_buckets[period].setdefault(key, {"credits": 0.0, "deposits": 0})
+        bucket["credits"] += entry["credits_earned"]
+        bucket["deposits"] += 1
+
+def update_leaderboard(user_id, old_balance, new_balance):
+    if old_balance is not None:
+        credit_leaderboard.discard((-old_balance, user_id))
+    credit_leaderboard.add((-new_balance, user_id))
+
+def load_credit_indexes():
+    credit_history.clear()
+    for period in credit_buckets:
+        credit_buckets[period].clear()
+    credit_leaderboard.clear()
+    credit_leaderboard.update((-balance, user_id) for user_id, balance in user_credits.items())
+    if os.path.exists(CREDIT_HISTORY_FILE):
+        with open(CREDIT_HISTORY_FILE, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entry["timestamp"] = parse_timestamp(entry["timestamp"])
+                    index_deposit(entry)
+
+def append_credit_history(entry):
+    with open(CREDIT_HISTORY_FILE, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
 load_credits_db()
+load_credit_indexes()
+
+# --- Manifest store: append-only JSON lines with in-memory indexes of byte offsets ---
+MANIFEST_DB_FILE = "manifests_db.jsonl"
+MANIFEST_FEEDBACK_FILE = "manifest_feedback.jsonl"
+# manifest_id -> byte offset of its record in MANIFEST_DB_FILE
+manifest_offsets: Dict[str, int] = {}
+# (timestamp, manifest_id) kept sorted, overall and per bin
+manifest_timeline: List[Tuple[str, str]] = []
+manifest_bin_timeline: Dict[str, List[Tuple[str, str]]] = {}
+# manifest_id -> collector feedback linked to it
+manifest_feedback: Dict[str, List[dict]] = {}
+# bin_id -> manifests deposited since the bin's last collector feedback
+bin_pending_manifests: Dict[str, List[str]] = {}
+# (bin_id, day) -> counts of reviewed manifests by their latest verdict, kept up to date
+# as feedback arrives so contamination queries never re-read manifests
+contamination_counts: Dict[Tuple[str, str], dict] = {}
+MANIFEST_VERDICT_FIELDS = ["bin_id", "timestamp", "classified_items"]
+
+def index_manifest(manifest, offset):
+    key = (manifest["timestamp"], manifest["manifest_id"])
+    manifest_offsets[manifest["manifest_id"]] = offset
+    bisect.insort(manifest_timeline, key)
+    bisect.insort(manifest_bin_timeline.setdefault(manifest.get("bin_id"), []), key)
+
+def load_manifest_indexes():
+    manifest_offsets.clear()
+    manifest_timeline.clear()
+    manifest_bin_timeline.clear()
+    manifest_feedback.clear()
+    bin_pending_manifests.clear()
+    contamination_counts.clear()
+    if os.path.exists(MANIFEST_FEEDBACK_FILE):
+        with open(MANIFEST_FEEDBACK_FILE, "r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    manifest_feedback.setdefault(entry["manifest_id"], []).append(entry)
+    if os.path.exists(MANIFEST_DB_FILE):
+        # Only the indexed fields are kept; full records are read back on demand
+        with open(MANIFEST_DB_FILE, "rb") as f:
+            offset = f.tell()
+            for line in iter(f.readline, b""):
+                if line.strip():
+                    manifest = json.loads(line)
+                    index_manifest(manifest, offset)
+                    feedback = manifest_feedback.get(manifest["manifest_id"])
+                    if feedback:
+                        count_verdict(manifest, feedback[-1]["collector_status"])
+                    else:
+                        bin_pending_manifests.setdefault(manifest.get("bin_id"), []).append(manifest["manifest_id"])
+                offset = f.tell()
+
+def save_manifest(manifest):
+    with open(MANIFEST_DB_FILE, "ab") as f:
+        offset = f.tell()
+        f.write(json.dumps(manifest, separators=(",", ":")).encode("utf-8") + b"\n")
+    index_manifest(manifest, offset)
+    bin_pending_manifests.setdefault(manifest.get("bin_id"), []).append(manifest["manifest_id"])
+
+def read_manifests(manifest_ids, fields=None):
+    """Yields stored manifests one at a time, optionally projected to the given fields."""
+    with open(MANIFEST_DB_FILE, "rb") as f:
+        for manifest_id in manifest_ids:
+            f.seek(manifest_offsets[manifest_id])
+            manifest = json.loads(f.readline())
+            if fields:
+                manifest = {k: manifest[k] for k in ["manifest_id", *fields] if k in manifest}
+            manifest["feedback"] = manifest_feedback.get(manifest_id, [])
+            yield manifest
+
+def count_verdict(manifest, collector_status, sign=1):
+    key = (manifest.get("bin_id"), manifest["timestamp"][:10])
+    counts = contamination_counts.setdefault(key, {"reviewed": 0, "contaminated": 0, "by_category": {}})
+    counts["reviewed"] += sign
+    if collector_status == "Contaminated":
+        counts["contaminated"] += sign
+    for item in manifest.get("classified_items", []):
+        by_status = counts["by_category"].setdefault(item.get("category", "Unknown"), {})
+        by_status[collector_status] = by_status.get(collector_status, 0) + sign
+
+def link_manifest_feedback(manifest, collector_status, timestamp, bin_id=None):
+    """Records a verdict for a manifest read with MANIFEST_VERDICT_FIELDS; only the latest one is counted."""
+    manifest_id = manifest["manifest_id"]
+    previous = manifest_feedback.get(manifest_id)
+    if previous:
+        count_verdict(manifest, previous[-1]["collector_status"], sign=-1)
+    entry = {"manifest_id": manifest_id, "collector_status": collector_status, "timestamp": timestamp}
+    if bin_id:
+        entry["bin_id"] = bin_id
+    with open(MANIFEST_FEEDBACK_FILE, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    manifest_feedback.setdefault(manifest_id, []).append(entry)
+    count_verdict(manifest, collector_status)
+
+def timeline_range(timeline, start=None, end=None):
+    lo = bisect.bisect_left(timeline, (parse_timestamp(start),)) if start else 0
+    hi = bisect.bisect_right(timeline, (parse_timestamp(end, end_of_day=True), "\uffff")) if end else len(timeline)
+    return lo, hi
+
+load_manifest_indexes()
 
 # --- Pydantic models for request bodies ---
 class ProcessedData(BaseModel):
@@ -132,6 +290,121 @@ def clean_items(raw_text):
         items.append(line)
     return list(dict.fromkeys(items))
 
+# Per-bag limits for each stream; volume limits only apply to items with a known volume_l
+BAG_LIMITS = {
+    "Wet": {"weight_kg": 8.0, "volume_l": 30.0},
+    "Dry": {"weight_kg": 5.0, "volume_l": 60.0},
+    "Recyclable": {"weight_kg": 6.0, "volume_l": 60.0},
+}
+DEFAULT_BAG_LIMITS = {"weight_kg": 5.0, "volume_l": 50.0}
+# Streams with at most this many items are also run through the exact solver
+EXACT_PACKING_MAX_ITEMS = 12
+
+def item_size(item):
+    try:
+        weight = max(0.0, float(item.get("weight_kg") or 0.0))
+    except (TypeError, ValueError):
+        weight = 0.0
+    try:
+        volume = max(0.0, float(item.get("volume_l") or 0.0))
+    except (TypeError, ValueError):
+        volume = 0.0
+    return weight, volume
+
+def find_first_fit(room_w, room_v, leaves, weight, volume):
+    """Returns the leftmost bag slot with room for the item, or None."""
+    # Small tolerance so float rounding never rejects an item that fills a bag exactly
+    weight, volume = weight - 1e-9, volume - 1e-9
+    stack = [1]
+    while stack:
+        node = stack.pop()
+        if room_w[node] < weight or room_v[node] < volume:
+            continue
+        if node >= leaves:
+            return node - leaves
+        stack.append(2 * node + 1)
+        stack.append(2 * node)
+    return None
+
+def pack_first_fit_decreasing(sizes, limits):
+    """Returns a list of bags, each a list of indexes into sizes."""
+    max_weight, max_volume = limits["weight_kg"], limits["volume_l"]
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True)
+    leaves = 1
+    while leaves < len(sizes):
+        leaves *= 2
+    # Max-trees over bag slots of the remaining weight and volume, so finding the
+    # first bag with room takes O(log n); unopened slots hold -1 and never match
+    room_w = [-1.0] * (2 * leaves)
+    room_v = [-1.0] * (2 * leaves)
+    bags = []
+    for i in order:
+        weight, volume = sizes[i]
+        b = find_first_fit(room_w, room_v, leaves, weight, volume)
+        if b is None:
+            b = len(bags)
+            bags.append([])
+            rem_w, rem_v = max_weight, max_volume
+        else:
+            rem_w, rem_v = room_w[leaves + b], room_v[leaves + b]
+        bags[b].append(i)
+        node = leaves + b
+        room_w[node], room_v[node] = rem_w - weight, rem_v - volume
+        node //= 2
+        while node:
+            room_w[node] = max(room_w[2 * node], room_w[2 * node + 1])
+            room_v[node] = max(room_v[2 * node], room_v[2 * node + 1])
+            node //= 2
+    return bags
+
+def pack_exact(sizes, limits, max_bags):
+    """Depth-first search for a packing into fewer than max_bags bags, or None."""
+    max_weight, max_volume = limits["weight_kg"], limits["volume_l"]
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True)
+    total_weight = sum(w for w, _ in sizes)
+    lower = max(1, math.ceil(total_weight / max_weight - 1e-9)) if max_weight > 0 else 1
+
+    def place(pos, bags, loads, bag_limit):
+        if pos == len(order):
+            return True
+        i = order[pos]
+        weight, volume = sizes[i]
+        seen = set()
+        for b in range(len(bags)):
+            # Bags with identical loads are interchangeable, try only one of them
+            if loads[b] in seen:
+                continue
+            seen.add(loads[b])
+            load_w, load_v = loads[b]
+            if load_w + weight <= max_weight and load_v + volume <= max_volume:
+                bags[b].append(i)
+                loads[b] = (load_w + weight, load_v + volume)
+                if place(pos + 1, bags, loads, bag_limit):
+                    return True
+                bags[b].pop()
+                loads[b] = (load_w, load_v)
+        if len(bags) < bag_limit:
+            bags.append([i])
+            loads.append((weight, volume))
+            if place(pos + 1, bags, loads, bag_limit):
+                return True
+            bags.pop()
+            loads.pop()
+        return False
+
+    for bag_limit in range(lower, max_bags):
+        bags = []
+        if place(0, bags, [], bag_limit):
+            return bags
+    return None
+
+def pack_stream(items, limits):
+    sizes = [item_size(item) for item in items]
+    bags = pack_first_fit_decreasing(sizes, limits)
+    if 1 < len(bags) and len(items) <= EXACT_PACKING_MAX_ITEMS:
+        bags = pack_exact(sizes, limits, len(bags)) or bags
+    return bags, sizes
+
 def generate_bag_recipe(classified_items):
     streams = {}
     for item in classified_items:
@@ -139,7 +412,7 @@ def generate_bag_recipe(classified_items):
         streams.setdefault(stream, []).append(item)
     bag_recipes = []
     for stream, items in streams.items():
-        bag_count = max(1, (len(items) + 9) // 10)
+        limits = BAG_LIMITS.get(stream, DEFAULT_BAG_LIMITS)
         instructions = []
         for itm in items:
             item_name = itm.get("item", "Unknown Item").strip()
@@ -147,20 +420,42 @@ def generate_bag_recipe(classified_items):
                 item_name = "Unknown Item"
             note = itm.get("note", "Check item before disposal.")
             instructions.append({"item": item_name, "note": note})
+        packed, sizes = pack_stream(items, limits)
+        bags = []
+        for number, indexes in enumerate(packed, start=1):
+            indexes.sort()
+            weight = sum(sizes[i][0] for i in indexes)
+            volume = sum(sizes[i][1] for i in indexes)
+            # Only a single item too big for any bag can end up here; it cannot be split
+            over_limit = weight > limits["weight_kg"] + 1e-9 or volume > limits["volume_l"] + 1e-9
+            for i in indexes:
+                instructions[i]["bag"] = number
+                if over_limit:
+                    instructions[i]["note"] += " Exceeds the bag limit; bag separately or take to a collection point."
+            bags.append({
+                "bag": number,
+                "items": [instructions[i]["item"] for i in indexes],
+                "weight_kg": round(weight, 3),
+                "volume_l": round(volume, 3),
+                "over_limit": over_limit
+            })
         bag_recipes.append({
             "stream": stream,
-            "bag_count": bag_count,
+            "bag_count": max(1, len(bags)),
+            "bag_limits": limits,
+            "bags": bags,
             "instructions": instructions
         })
     return bag_recipes
 
 def generate_manifest(classified_items, bag_recipes, bin_id):
     manifest_id = str(uuid.uuid4())
-    timestamp = datetime.now().isoformat()
+    timestamp = datetime.now().isoformat(timespec="microseconds")
     total_weight = sum(item.get('weight_kg', 0) for item in classified_items)
     return {
         "manifest_id": manifest_id,
         "timestamp": timestamp,
+        "bin_id": bin_id,
         "location": bin_data.get(bin_id, {}).get("location"),
         "total_items": len(classified_items),
         "total_bags": sum(bag['bag_count'] for bag in bag_recipes),
@@ -320,6 +615,7 @@ async def process_file(file: UploadFile = File(...), bin_id: str = Form(...)):
         
         bag_recipes = generate_bag_recipe(results)
         manifest = generate_manifest(results, bag_recipes, bin_id)
+        save_manifest(manifest)
         
         save_classified_data({
             "timestamp": datetime.now().isoformat(),
@@ -335,18 +631,34 @@ async def process_file(file: UploadFile = File(...), bin_id: str = Form(...)):
 
 @app.post("/feedback")
 async def receive_feedback(feedback: ManifestFeedback):
+    if feedback.manifest_id not in manifest_offsets:
+        return JSONResponse({"error": "Unknown manifest_id."}, status_code=404)
     feedback_log.append(feedback.dict())
+    manifest = next(read_manifests([feedback.manifest_id], MANIFEST_VERDICT_FIELDS))
+    # Already reviewed, so the next bin check must not add a second verdict
+    pending = bin_pending_manifests.get(manifest.get("bin_id"), [])
+    if feedback.manifest_id in pending:
+        pending.remove(feedback.manifest_id)
+    link_manifest_feedback(manifest, feedback.collector_status, feedback.timestamp)
     print(f"Received feedback for Manifest ID {feedback.manifest_id}: Status is {feedback.collector_status}")
     return {"message": "Feedback received successfully", "manifest_id": feedback.manifest_id}
 
 @app.post("/bin_feedback")
 async def receive_bin_feedback(feedback: BinFeedback):
     feedback_log.append(feedback.dict())
+    # The collector's verdict covers every manifest deposited since the bin was last checked
+    pending = bin_pending_manifests.pop(feedback.bin_id, [])
+    for manifest in read_manifests(pending, MANIFEST_VERDICT_FIELDS):
+        link_manifest_feedback(manifest, feedback.collector_status, feedback.timestamp, bin_id=feedback.bin_id)
     if feedback.collector_status == "Valid" and feedback.bin_id in bin_data:
         bin_data[feedback.bin_id]["fill_level_kg"] = 0.0
     print(f"Received feedback for Bin ID {feedback.bin_id}: Status is {feedback.collector_status}")
     return {"message": "Bin feedback received successfully", "bin_id": feedback.bin_id}
 
+@app.get("/bins")
+async def list_bins():
+    return JSONResponse({"bins": list(bin_data.keys())})
+
 @app.get("/analytics")
 async def get_analytics():
     return JSONResponse({"feedback_data": feedback_log, "bin_status": bin_data})
@@ -366,16 +678,97 @@ async def optimize_routes():
     
     return JSONResponse({"message": "Pickup route optimized.", "route": route_result})
 
+# --- Manifest Store Endpoints ---
+@app.get("/manifests/{manifest_id}")
+async def get_manifest(manifest_id: str, fields: str = None):
+    if manifest_id not in manifest_offsets:
+        return JSONResponse({"error": "Manifest not found."}, status_code=404)
+    projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    return JSONResponse(next(read_manifests([manifest_id], projection)))
+
+@app.get("/manifests")
+async def query_manifests(bin_id: str = None, start: str = None, end: str = None, offset: int = 0, limit: int = 20, fields: str = None):
+    timeline = manifest_bin_timeline.get(bin_id, []) if bin_id else manifest_timeline
+    try:
+        lo, hi = timeline_range(timeline, start, end)
+    except ValueError:
+        return JSONResponse({"error": "Invalid start or end timestamp."}, status_code=400)
+
+    # Newest manifests first: walk back from the end of the matching range
+    offset = max(0, offset)
+    limit = max(1, min(limit, 100))
+    page_end = max(lo, hi - offset)
+    page_start = max(lo, page_end - limit)
+    manifest_ids = [manifest_id for _, manifest_id in reversed(timeline[page_start:page_end])]
+    projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    return JSONResponse({
+        "total": max(0, hi - lo),
+        "offset": offset,
+        "limit": limit,
+        "manifests": list(read_manifests(manifest_ids, projection))
+    })
+
+@app.get("/manifest_contamination")
+async def get_manifest_contamination(bin_id: str = None, start: str = None, end: str = None):
+    timeline = manifest_bin_timeline.get(bin_id, []) if bin_id else manifest_timeline
+    # Counters are kept per bin and day, so start and end are truncated to whole days here
+    try:
+        start_day = parse_timestamp(start)[:10] if start else None
+        end_day = parse_timestamp(end)[:10] if end else None
+        lo, hi = timeline_range(timeline, start_day, end_day)
+    except ValueError:
+        return JSONResponse({"error": "Invalid start or end timestamp."}, status_code=400)
+
+    reviewed = 0
+    contaminated = 0
+    by_category = {}
+    for (bucket_bin, day), counts in contamination_counts.items():
+        if (bin_id and bucket_bin != bin_id) or (start_day and day < start_day) or (end_day and day > end_day):
+            continue
+        reviewed += counts["reviewed"]
+        contaminated += counts["contaminated"]
+        for category, by_status in counts["by_category"].items():
+            totals = by_category.setdefault(category, {})
+            for status, n in by_status.items():
+                if n:
+                    totals[status] = totals.get(status, 0) + n
+
+    return JSONResponse({
+        "manifests": max(0, hi - lo),
+        "reviewed_manifests": reviewed,
+        "contaminated_manifests": contaminated,
+        "contamination_rate": round(contaminated / reviewed * 100, 2) if reviewed else 0.0,
+        "by_category": by_category
+    })
+
 # --- NEW: Credit System Endpoints ---
 @app.post("/deposit_recyclable")
 async def deposit_recyclable_plastic(deposit: CreditDeposit):
     if deposit.waste_type.lower() != "recyclable plastics":
         return JSONResponse({"message": "Incorrect waste type. Only 'Recyclable Plastics' are accepted for credits."}, status_code=400)
     
+    try:
+        timestamp = parse_timestamp(deposit.timestamp)
+    except ValueError:
+        return JSONResponse({"message": "Invalid timestamp. Use ISO 8601 format."}, status_code=400)
+
     credits_earned = deposit.weight_kg * CREDIT_RATE
-    user_credits[deposit.user_id] = user_credits.get(deposit.user_id, 0.0) + credits_earned
+    old_balance = user_credits.get(deposit.user_id)
+    user_credits[deposit.user_id] = (old_balance or 0.0) + credits_earned
     save_credits_db() # Persist the changes
 
+    entry = {
+        "user_id": deposit.user_id,
+        "waste_type": deposit.waste_type,
+        "weight_kg": deposit.weight_kg,
+        "credits_earned": credits_earned,
+        "timestamp": timestamp
+    }
+    append_credit_history(entry)
+    index_deposit(entry)
+    update_leaderboard(deposit.user_id, old_balance, user_credits[deposit.user_id])
+
     return JSONResponse({
         "message": "Deposit successful",
         "user_id": deposit.user_id,
@@ -388,6 +781,57 @@ async def get_user_balance(user_id: str):
     balance = user_credits.get(user_id, 0.0)
     return JSONResponse({"user_id": user_id, "balance": balance})
 
+@app.get("/leaderboard")
+async def get_leaderboard(limit: int = 10):
+    limit = max(1, min(limit, 100))
+    top = [
+        {"rank": rank, "user_id": user_id, "balance": -neg_balance}
+        for rank, (neg_balance, user_id) in enumerate(credit_leaderboard[:limit], start=1)
+    ]
+    return JSONResponse({"total_users": len(credit_leaderboard), "leaderboard": top})
+
+@app.get("/user_history/{user_id}")
+async def get_user_history(user_id: str, offset: int = 0, limit: int = 20, start: str = None, end: str = None):
+    history = credit_history.get(user_id, [])
+    try:
+        lo = bisect.bisect_left(history, parse_timestamp(start), key=lambda e: e["timestamp"]) if start else 0
+        hi = bisect.bisect_right(history, parse_timestamp(end, end_of_day=True), key=lambda e: e["timestamp"]) if end else len(history)
+    except ValueError:
+        return JSONResponse({"error": "Invalid start or end timestamp."}, status_code=400)
+
+    # Newest deposits first: walk back from the end of the matching range
+    offset = max(0, offset)
+    limit = max(1, min(limit, 100))
+    page_end = max(lo, hi - offset)
+    page_start = max(lo, page_end - limit)
+    deposits = history[page_start:page_end][::-1]
+
+    return JSONResponse({
+        "user_id": user_id,
+        "total": max(0, hi - lo),
+        "offset": offset,
+        "limit": limit,
+        "deposits": deposits
+    })
+
+@app.get("/credit_totals")
+async def get_credit_totals(period: str = "day", start: str = None, end: str = None):
+    if period not in credit_buckets:
+        return JSONResponse({"error": "period must be 'day' or 'week'."}, status_code=400)
+    try:
+        start_key = bucket_keys(parse_timestamp(start))[period] if start else None
+        end_key = bucket_keys(parse_timestamp(end, end_of_day=True))[period] if end else None
+    except ValueError:
+        return JSONResponse({"error": "Invalid start or end timestamp."}, status_code=400)
+
+    totals = []
+    for key in sorted(credit_buckets[period]):
+        if (start_key and key < start_key) or (end_key and key > end_key):
+            continue
+        bucket = credit_buckets[period][key]
+        totals.append({"period": key, "credits": round(bucket["credits"], 2), "deposits": bucket["deposits"]})
+    return JSONResponse({"period": period, "totals": totals})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
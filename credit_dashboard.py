@@ -1,4 +1,5 @@
 import streamlit as st
+import pandas as pd
 import requests
 from datetime import datetime
 
@@ -52,3 +53,72 @@ if st.button("Check Balance"):
         
     except requests.exceptions.RequestException as e:
         st.error(f"❌ Failed to check balance: {e}")
+
+st.markdown("---")
+
+# Leaderboard of the top users, served from the backend's sorted index
+st.subheader("🏆 Leaderboard")
+top_k = st.slider("Number of users to show", min_value=5, max_value=50, value=10, step=5)
+
+if st.button("Show Leaderboard"):
+    try:
+        response = requests.get(f"{BACKEND_CREDIT_URL}/leaderboard", params={"limit": top_k})
+        response.raise_for_status()
+
+        leaderboard = response.json().get("leaderboard", [])
+        if leaderboard:
+            st.dataframe(pd.DataFrame(leaderboard), use_container_width=True)
+        else:
+            st.warning("No credits have been earned yet.")
+
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ Failed to load leaderboard: {e}")
+
+st.markdown("---")
+
+# Paginated deposit history for a single user
+st.subheader("📜 Deposit History")
+history_user_id = st.text_input("Enter your User ID to view history", "user123")
+page_size = 20
+page = st.number_input("Page", min_value=1, value=1, step=1)
+
+if st.button("Show History"):
+    try:
+        response = requests.get(
+            f"{BACKEND_CREDIT_URL}/user_history/{history_user_id}",
+            params={"offset": (page - 1) * page_size, "limit": page_size}
+        )
+        response.raise_for_status()
+
+        result = response.json()
+        deposits = result.get("deposits", [])
+        if deposits:
+            st.caption(f"Showing {len(deposits)} of {result['total']} deposits (newest first)")
+            st.dataframe(pd.DataFrame(deposits), use_container_width=True)
+        else:
+            st.warning("No deposits found for this page.")
+
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ Failed to load history: {e}")
+
+st.markdown("---")
+
+# Credits earned per day or per ISO week
+st.subheader("📊 Credit Totals")
+period = st.radio("Group by", ["day", "week"], horizontal=True)
+
+if st.button("Show Totals"):
+    try:
+        response = requests.get(f"{BACKEND_CREDIT_URL}/credit_totals", params={"period": period})
+        response.raise_for_status()
+
+        totals = response.json().get("totals", [])
+        if totals:
+            df_totals = pd.DataFrame(totals).set_index("period")
+            st.bar_chart(df_totals["credits"])
+            st.dataframe(df_totals, use_container_width=True)
+        else:
+            st.warning("No deposits recorded yet.")
+
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ Failed to load credit totals: {e}")
@@ -98,8 +98,14 @@ if uploaded_file is not None:
             for bag in bag_recipes:
                 stream_name = bag['stream']
                 st.markdown(f"**Stream:** {stream_name} | **Bags Needed:** {bag['bag_count']}")
+                bag_weights = ", ".join(f"Bag {b['bag']}: {b['weight_kg']} kg" for b in bag.get("bags", []))
+                if bag_weights:
+                    st.caption(f"{bag_weights} (limit {bag['bag_limits']['weight_kg']} kg per bag)")
+                for b in bag.get("bags", []):
+                    if b.get("over_limit"):
+                        st.warning(f"⚠ Bag {b['bag']} exceeds the bag limit: {', '.join(b['items'])}")
                 df_bag = pd.DataFrame(bag["instructions"])
-                df_bag.rename(columns={"item": "Item", "note": "Instruction"}, inplace=True)
+                df_bag.rename(columns={"item": "Item", "note": "Instruction", "bag": "Bag"}, inplace=True)
                 st.dataframe(df_bag.style.set_properties(**{'background-color': color_map.get(stream_name,"#ffffff")}), use_container_width=True)
     else:
         st.warning("⚠ No valid items found or classification failed.")
\ No newline at end of file
@@ -1,28 +1,276 @@
 # generate_qrs.py
 
-import qrcode
+import argparse
+import csv
+import hashlib
+import json
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+import qrcode
+import requests
+from PIL import Image, ImageDraw
 
 # Your backend's URL for the collector app, with a placeholder for the bin_id
 COLLECTOR_APP_URL_TEMPLATE = "http://localhost:8502/?bin_id={}"
 
-# Your bin IDs
+# Backend endpoint that lists every registered bin
+BACKEND_BINS_URL = "http://127.0.0.1:8000/bins"
+
+# Fallback bin IDs when neither the backend nor a CSV is available
 BINS = ["bin-A", "bin-B", "bin-C", "bin-D"]
 
-# Create a directory to store the QR codes
-qr_dir = "bin_qrs"
-os.makedirs(qr_dir, exist_ok=True)
-
-for bin_id in BINS:
-    # Construct the unique URL for each bin
-    bin_url = COLLECTOR_APP_URL_TEMPLATE.format(bin_id)
-    
-    # Generate the QR code
-    qr_img = qrcode.make(bin_url)
-    
-    # Save the QR code as a PNG file
-    file_path = os.path.join(qr_dir, f"qr_code_{bin_id}.png")
-    qr_img.save(file_path)
-    print(f"Generated QR code for {bin_id} at {file_path}")
-
-print("QR code generation complete.")
\ No newline at end of file
+# Directory to store the QR codes and the manifest of what is already rendered
+QR_DIR = "bin_qrs"
+MANIFEST_FILE = "qr_manifest.json"
+
+# QR settings; changing them changes every content hash and forces a re-render.
+# A fixed mask pattern is valid for every reader and skips qrcode's costly search for the best one.
+QR_SETTINGS = {"error_correction": "M", "box_size": 10, "border": 4, "mask_pattern": 0}
+
+# Print sheets: A4 at 150 dpi with a 4 x 5 grid of labelled codes
+SHEET_SIZE = (1240, 1754)
+SHEET_COLUMNS, SHEET_ROWS = 4, 5
+SHEET_MARGIN = 60
+
+# Bins handed to each worker at once, to keep inter-process overhead low
+CHUNK_SIZE = 250
+
+def load_bins_from_backend(url=BACKEND_BINS_URL):
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    return response.json().get("bins", [])
+
+def load_bins_from_csv(path):
+    """Reads bin IDs from a `bin_id` column, or the first column if there is no header."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row and row[0].strip()]
+    if rows and "bin_id" in [cell.strip() for cell in rows[0]]:
+        column = [cell.strip() for cell in rows[0]].index("bin_id")
+        rows = rows[1:]
+    else:
+        column = 0
+    return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+
+def bin_url(bin_id):
+    return COLLECTOR_APP_URL_TEMPLATE.format(quote(bin_id, safe=""))
+
+def content_hash(bin_id):
+    payload = json.dumps({"url": bin_url(bin_id), "settings": QR_SETTINGS}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def safe_name(bin_id):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", bin_id)
+
+def qr_matrix(bin_id):
+    """Returns the QR modules for a bin, border included, as rows of booleans."""
+    qr = qrcode.QRCode(
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{QR_SETTINGS['error_correction']}"),
+        border=QR_SETTINGS["border"],
+        mask_pattern=QR_SETTINGS["mask_pattern"],
+    )
+    qr.add_data(bin_url(bin_id))
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+def matrix_image(matrix, box_size):
+    # Build the image module-by-module and scale it up, rather than drawing every box
+    n = len(matrix)
+    img = Image.frombytes("L", (n, n), bytes(0 if dark else 255 for row in matrix for dark in row))
+    return img.convert("1").resize((n * box_size, n * box_size), Image.NEAREST)
+
+def matrix_svg(matrix, box_size):
+    # One path, with each horizontal run of dark modules drawn as a single rectangle
+    n = len(matrix)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < n:
+            if row[x]:
+                start = x
+                while x < n and row[x]:
+                    x += 1
+                runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+            else:
+                x += 1
+    size = n * box_size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {n} {n}" shape-rendering="crispEdges">'
+        f'<rect width="{n}" height="{n}" fill="#fff"/><path d="{"".join(runs)}" fill="#000"/></svg>\n'
+    )
+
+def render_files(bin_ids, out_dir, formats):
+    """Worker: writes one PNG and/or SVG per bin and returns the paths written."""
+    written = []
+    for bin_id in bin_ids:
+        matrix = qr_matrix(bin_id)
+        if "png" in formats:
+            path = os.path.join(out_dir, f"qr_code_{safe_name(bin_id)}.png")
+            matrix_image(matrix, QR_SETTINGS["box_size"]).save(path)
+            written.append(path)
+        if "svg" in formats:
+            path = os.path.join(out_dir, f"qr_code_{safe_name(bin_id)}.svg")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(matrix_svg(matrix, QR_SETTINGS["box_size"]))
+            written.append(path)
+    return written
+
+def render_sheet(bin_ids, path):
+    """Worker: lays out one printable page of labelled QR codes and saves it as a PDF."""
+    sheet = Image.new("1", SHEET_SIZE, 1)
+    draw = ImageDraw.Draw(sheet)
+    cell_w = (SHEET_SIZE[0] - 2 * SHEET_MARGIN) // SHEET_COLUMNS
+    cell_h = (SHEET_SIZE[1] - 2 * SHEET_MARGIN) // SHEET_ROWS
+    label_h = 30
+    for n, bin_id in enumerate(bin_ids):
+        matrix = qr_matrix(bin_id)
+        box_size = max(1, (min(cell_w, cell_h - label_h) - 10) // len(matrix))
+        size = box_size * len(matrix)
+        x = SHEET_MARGIN + (n % SHEET_COLUMNS) * cell_w + (cell_w - size) // 2
+        y = SHEET_MARGIN + (n // SHEET_COLUMNS) * cell_h
+        sheet.paste(matrix_image(matrix, box_size), (x, y))
+        draw.text((x + size // 2, y + size + 5), bin_id, fill=0, anchor="ma")
+    sheet.save(path, "PDF", resolution=150)
+    return path
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return {"bins": {}, "sheets": {}}
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+def generate(bin_ids, out_dir=QR_DIR, formats=("png",), sheets=False, workers=None, force=False, prune=False):
+    os.makedirs(out_dir, exist_ok=True)
+    bin_ids = list(dict.fromkeys(bin_ids))
+    manifest = load_manifest(out_dir)
+    hashes = {bin_id: content_hash(bin_id) for bin_id in bin_ids}
+
+    # A bin is current when its hash is unchanged and every requested file is on disk
+    def is_current(bin_id):
+        entry = manifest["bins"].get(bin_id)
+        if force or not entry or entry["hash"] != hashes[bin_id]:
+            return False
+        return all(
+            os.path.exists(os.path.join(out_dir, f"qr_code_{safe_name(bin_id)}.{fmt}"))
+            for fmt in formats
+        )
+
+    stale = [bin_id for bin_id in bin_ids if not is_current(bin_id)]
+
+    per_sheet = SHEET_COLUMNS * SHEET_ROWS
+    sheet_dir = os.path.join(out_dir, "sheets")
+    stale_sheets = []
+    sheet_hashes = {}
+    if sheets:
+        os.makedirs(sheet_dir, exist_ok=True)
+        for n in range(0, len(bin_ids), per_sheet):
+            page = bin_ids[n:n + per_sheet]
+            name = f"qr_sheet_{n // per_sheet + 1:05d}.pdf"
+            sheet_hashes[name] = hashlib.sha256("".join(hashes[b] for b in page).encode("utf-8")).hexdigest()
+            if force or manifest["sheets"].get(name) != sheet_hashes[name] or not os.path.exists(os.path.join(sheet_dir, name)):
+                stale_sheets.append((page, os.path.join(sheet_dir, name)))
+
+    if stale or stale_sheets:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            file_jobs = [
+                pool.submit(render_files, stale[n:n + CHUNK_SIZE], out_dir, formats)
+                for n in range(0, len(stale), CHUNK_SIZE)
+            ]
+            sheet_jobs = [pool.submit(render_sheet, page, path) for page, path in stale_sheets]
+            for job in file_jobs + sheet_jobs:
+                job.result()
+
+    for bin_id in stale:
+        manifest["bins"][bin_id] = {"hash": hashes[bin_id]}
+
+    # Only on request: bins missing from this run may just be outside a partial batch
+    removed = [bin_id for bin_id in manifest["bins"] if bin_id not in hashes] if prune else []
+    current_names = {safe_name(bin_id) for bin_id in bin_ids}
+    for bin_id in removed:
+        del manifest["bins"][bin_id]
+        if safe_name(bin_id) in current_names:
+            continue
+        for fmt in ("png", "svg"):
+            path = os.path.join(out_dir, f"qr_code_{safe_name(bin_id)}.{fmt}")
+            if os.path.exists(path):
+                os.remove(path)
+
+    combined = os.path.join(out_dir, "qr_sheets.pdf")
+    orphaned = []
+    if prune and os.path.isdir(sheet_dir):
+        # Sheets not rebuilt this run would still print the pruned bins, so they go too
+        orphaned = [
+            name for name in os.listdir(sheet_dir)
+            if name.startswith("qr_sheet_") and name.endswith(".pdf") and name not in sheet_hashes
+        ]
+        if not sheets and removed:
+            orphaned = [name for name in os.listdir(sheet_dir) if name.startswith("qr_sheet_") and name.endswith(".pdf")]
+            manifest["sheets"] = {}
+            if os.path.exists(combined):
+                os.remove(combined)
+        for name in orphaned:
+            os.remove(os.path.join(sheet_dir, name))
+
+    if sheets:
+        manifest["sheets"] = sheet_hashes
+        if stale_sheets or orphaned or not os.path.exists(combined):
+            from PyPDF2 import PdfWriter
+            writer = PdfWriter()
+            for name in sorted(sheet_hashes):
+                writer.append(os.path.join(sheet_dir, name))
+            with open(combined, "wb") as f:
+                writer.write(f)
+    save_manifest(out_dir, manifest)
+
+    return {
+        "bins": len(bin_ids),
+        "rendered": len(stale),
+        "skipped": len(bin_ids) - len(stale),
+        "removed": len(removed),
+        "sheets": len(stale_sheets),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate collector QR codes for WasteWise bins.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--csv", help="CSV file with a bin_id column (or bin IDs in the first column)")
+    source.add_argument("--backend", nargs="?", const=BACKEND_BINS_URL, help="Read bin IDs from the backend's bin registry")
+    parser.add_argument("--out", default=QR_DIR, help="Output directory")
+    parser.add_argument("--formats", default="png", help="Comma-separated per-bin formats: png, svg")
+    parser.add_argument("--sheets", action="store_true", help="Also build printable PDF sheets")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--force", action="store_true", help="Re-render even if the QR is already current")
+    parser.add_argument("--prune", action="store_true", help="Delete QR files and sheets of bins not in this run")
+    args = parser.parse_args()
+
+    if args.csv:
+        bin_ids = load_bins_from_csv(args.csv)
+    elif args.backend:
+        try:
+            bin_ids = load_bins_from_backend(args.backend)
+        except requests.exceptions.RequestException as e:
+            parser.exit(1, f"Failed to fetch bins from backend: {e}\n")
+    else:
+        bin_ids = BINS
+
+    formats = tuple(fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip())
+    unknown = set(formats) - {"png", "svg"}
+    if unknown:
+        parser.error(f"Unsupported format(s): {', '.join(sorted(unknown))}")
+
+    result = generate(bin_ids, args.out, formats, args.sheets, args.workers, args.force, args.prune)
+    print(f"Generated QR codes for {result['rendered']} bins, skipped {result['skipped']} already current,"
+          f" removed {result['removed']} retired ({result['sheets']} sheets rebuilt) in {args.out}")
+    print("QR code generation complete.")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import matplotlib.pyplot as plt
 # URL of your backend's analytics endpoint
 BACKEND_ANALYTICS_URL = "http://127.0.0.1:8000/analytics"
 BACKEND_OPTIMIZE_URL = "http://127.0.0.1:8000/optimize_routes"
+BACKEND_CONTAMINATION_URL = "http://127.0.0.1:8000/manifest_contamination"
 
 def get_analytics_data():
     """Fetches analytics data from the backend."""
@@ -27,6 +28,17 @@ def optimize_routes():
         st.error(f"❌ Route optimization failed: {e}")
         return {"message": "Optimization failed."}
 
+def get_contamination_data(bin_id=None):
+    """Fetches manifest-level contamination analysis from the backend."""
+    try:
+        params = {"bin_id": bin_id} if bin_id else {}
+        response = requests.get(BACKEND_CONTAMINATION_URL, params=params)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ Failed to fetch contamination data: {e}")
+        return {}
+
 # --- STREAMLIT UI ---
 st.set_page_config(page_title="WasteWise Ops Dashboard", page_icon="📊", layout="wide")
 st.title("📊 WasteWise Operations Dashboard")
@@ -73,6 +85,26 @@ if st.button("Optimize Route Now", type="primary"):
         else:
             st.warning(route_result.get("message", "No bins are ready for pickup."))
 
+# --- MANIFEST CONTAMINATION SECTION ---
+st.markdown("---")
+st.subheader("🧪 Manifest Contamination Analysis")
+st.write("Collector feedback is linked to the manifests deposited in each bin since its last check.")
+
+contamination_bin = st.selectbox("Filter by bin", ["All bins"] + list(bin_data.keys()))
+contamination = get_contamination_data(None if contamination_bin == "All bins" else contamination_bin)
+if not contamination.get("reviewed_manifests"):
+    st.info("No manifests have collector feedback yet.")
+else:
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(label="Manifests", value=contamination["manifests"])
+    with col2:
+        st.metric(label="Reviewed Manifests", value=contamination["reviewed_manifests"])
+    with col3:
+        st.metric(label="Contamination Rate", value=f"{contamination['contamination_rate']}%")
+    df_categories = pd.DataFrame(contamination["by_category"]).T.fillna(0)
+    st.bar_chart(df_categories)
+
 # --- FEEDBACK ANALYTICS (Existing Code) ---
 st.markdown("---")
 if not feedback_data: